@@ -0,0 +1,58 @@
+"""
+Benchmark Markdown conversion throughput of the Markdown preset on large
+documents.
+
+Usage::
+
+    python benchmark.py
+
+`PARAGRAPH` is shared with the tests in `editor.tests`.
+"""
+
+import timeit
+
+
+PARAGRAPH = (
+    '## Heading\n\nSome *emphasized* and **strong** text with a '
+    '[link](http://example.com/) and `code`.\n\n'
+    '* item one\n* item two\n\n'
+)
+
+
+def setup():
+    """ Configure minimal settings for the Markdown preset. """
+
+    import django
+    from django.conf import settings
+
+    settings.configure(
+        SECRET_KEY='benchmark',
+        INSTALLED_APPS=['editor'],
+        EDITOR_PRESET='editor.presets.markdown'
+    )
+
+    if hasattr(django, 'setup'):
+        # Django >= 1.7
+        django.setup()
+
+
+def main(sizes=(100, 1000, 10000), repeat=3):
+    from editor.presets import markdown
+
+    assert markdown.is_available(), 'markdown package not installed.'
+
+    for size in sizes:
+        source = PARAGRAPH * size
+
+        duration = min(timeit.repeat(
+            lambda: markdown.render(source), number=1, repeat=repeat
+        ))
+
+        print('%8d bytes: %.3fs, %.2f MB/s' % (
+            len(source), duration, len(source) / duration / 1024 / 1024
+        ))
+
+
+if __name__ == '__main__':
+    setup()
+    main()
@@ -0,0 +1,146 @@
+from django.db.models import TextField
+
+
+def extract_images(value):
+    """
+    Extract inline images into files when `EDITOR_EXTRACT_INLINE_IMAGES` is
+    set, returning contents referencing them by URL.
+    """
+
+    from .settings import editor_settings
+    from .utils import extract_inline_images
+
+    if not value or not editor_settings.EXTRACT_INLINE_IMAGES:
+        return value
+
+    # Limits are validated by the form field
+    return extract_inline_images(
+        value, upload_to=editor_settings.INLINE_IMAGE_UPLOAD_TO
+    )
+
+
+class EditorFieldMixin(object):
+    """
+    Mixin for model fields of presets, using the editor form field. When
+    saving, inline images are extracted into files (with
+    `EDITOR_EXTRACT_INLINE_IMAGES` set) and contents are passed through
+    `EDITOR_SAVE_PIPELINE`, so that happens once rather than on every render.
+
+    Preset field classes are created when the preset is loaded, so they
+    cannot be referenced by migrations; set `deconstruct_path` to the import
+    path of an equivalent field to use instead.
+    """
+
+    editor_form_class = None
+    deconstruct_path = None
+
+    def formfield(self, **kwargs):
+        defaults = {}
+
+        if self.editor_form_class:
+            defaults['form_class'] = self.editor_form_class
+
+        defaults.update(kwargs)
+
+        return super(EditorFieldMixin, self).formfield(**defaults)
+
+    def pre_save(self, model_instance, add):
+        value = super(EditorFieldMixin, self).pre_save(model_instance, add)
+        transformed = self.transform(value)
+
+        if transformed != value:
+            setattr(model_instance, self.attname, transformed)
+
+        return transformed
+
+    def transform(self, value):
+        """ Transform contents once when saving. """
+
+        from .output import render
+        from .settings import editor_settings
+
+        if not value:
+            return value
+
+        return render(extract_images(value), editor_settings.SAVE_PIPELINE)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(EditorFieldMixin, self).deconstruct()
+
+        return name, self.deconstruct_path or path, args, kwargs
+
+
+class MarkdownField(TextField):
+    """
+    Model field for Markdown source, as used by the Markdown preset.
+
+    The source is converted to HTML once at save time and stored in an extra,
+    non-editable `<field>_html` field, so templates never convert on read.
+    Inline images are extracted from the source first, as with
+    `EditorFieldMixin`. Pass `rendered_field=False` to leave adding the
+    rendered field to the model, as migrations do.
+
+    When saving with `update_fields`, include `<field>_html` along with the
+    field, or the rendered HTML is not saved.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.rendered_field = kwargs.pop('rendered_field', True)
+
+        super(MarkdownField, self).__init__(*args, **kwargs)
+
+    @staticmethod
+    def rendered_field_name(name):
+        """ Name of the field holding the HTML rendered from field `name`. """
+
+        return '%s_html' % name
+
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        if self.rendered_field and not cls._meta.abstract:
+            # Rendered HTML is created after all other fields, so its
+            # pre_save() always runs after ours.
+            rendered_field = TextField(editable=False, blank=True)
+            cls.add_to_class(self.rendered_field_name(name), rendered_field)
+
+        super(MarkdownField, self).contribute_to_class(
+            cls, name, *args, **kwargs
+        )
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(MarkdownField, self).deconstruct()
+
+        # Migrations list the rendered field by itself
+        kwargs['rendered_field'] = False
+
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        from .presets import markdown
+
+        value = super(MarkdownField, self).pre_save(model_instance, add)
+        extracted = extract_images(value)
+
+        if extracted != value:
+            value = extracted
+            setattr(model_instance, self.attname, value)
+
+        # Convert once at save time, never on read
+        setattr(
+            model_instance,
+            self.rendered_field_name(self.attname),
+            markdown.render(value)
+        )
+
+        return value
+
+    def formfield(self, **kwargs):
+        from .presets import markdown
+
+        # Override the default widget and form field
+        defaults = {
+            'widget': markdown.get_widget(),
+            'form_class': markdown.get_form_field()
+        }
+        defaults.update(kwargs)
+
+        return super(MarkdownField, self).formfield(**defaults)
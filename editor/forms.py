@@ -0,0 +1,250 @@
+import copy
+
+from django import forms
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import TextField
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from .settings import editor_settings
+from .utils import (
+    CONFLICT_MARKERS_RE, content_hash, extract_inline_images, merge3
+)
+
+
+class EditorFormField(forms.CharField):
+    """
+    Form field for editor contents, keeping rows and responses small.
+
+    Posted contents longer than `EDITOR_MAX_POST_LENGTH` characters are
+    rejected before anything else is done. Contents longer than
+    `EDITOR_MAX_LENGTH` characters are rejected as well, counting inline
+    images as the URL they are extracted to when
+    `EDITOR_EXTRACT_INLINE_IMAGES` is set; the model field extracts them
+    when saving.
+    """
+
+    def to_python(self, value):
+        value = super(EditorFormField, self).to_python(value)
+
+        if not value:
+            return value
+
+        max_post_length = editor_settings.MAX_POST_LENGTH
+
+        if max_post_length and len(value) > max_post_length:
+            raise ValidationError(
+                'Ensure this content, including images, has at most %d '
+                'characters (it has %d).' % (max_post_length, len(value)),
+                code='max_post_length'
+            )
+
+        if not editor_settings.EXTRACT_INLINE_IMAGES:
+            self.validate_length(value)
+        else:
+            # Validate images and length as saved, without writing files
+            self.validate_length(extract_inline_images(
+                value,
+                upload_to=editor_settings.INLINE_IMAGE_UPLOAD_TO,
+                max_size=editor_settings.INLINE_IMAGE_MAX_SIZE,
+                save=False
+            ))
+
+        return value
+
+    def validate_length(self, value):
+        """ Raise ValidationError when exceeding `EDITOR_MAX_LENGTH`. """
+
+        max_length = editor_settings.MAX_LENGTH
+
+        if max_length and len(value) > max_length:
+            raise ValidationError(
+                'Ensure this content has at most %d characters '
+                '(it has %d).' % (max_length, len(value)),
+                code='max_length'
+            )
+
+
+def token_name(name):
+    """ Name of the concurrency token input belonging to field `name`. """
+
+    return '%s__token' % name
+
+
+def base_cache_key(token):
+    """ Cache key under which the content identified by `token` is kept. """
+
+    return 'editor:base:%s' % token
+
+
+class ConcurrencyTokenWidget(forms.Widget):
+    """
+    Wraps an editor widget, rendering a hidden concurrency token identifying
+    the original contents along with it. When `conflict` is set, it is
+    rendered below the widget as a read-only merge view.
+    """
+
+    def __init__(self, widget, token, conflict=None):
+        self.widget = widget
+        self.token = token
+        self.conflict = conflict
+
+        super(ConcurrencyTokenWidget, self).__init__(widget.attrs)
+
+    def __deepcopy__(self, memo):
+        obj = copy.copy(self)
+        obj.widget = copy.deepcopy(self.widget, memo)
+        obj.attrs = obj.widget.attrs
+        memo[id(self)] = obj
+
+        return obj
+
+    @property
+    def media(self):
+        return self.widget.media
+
+    @property
+    def is_hidden(self):
+        return self.widget.is_hidden
+
+    @property
+    def needs_multipart_form(self):
+        return self.widget.needs_multipart_form
+
+    def render(self, name, value, attrs=None):
+        token = forms.HiddenInput().render(token_name(name), self.token)
+        output = self.widget.render(name, value, attrs) + token
+
+        if self.conflict is not None:
+            output += '<pre class="editor-conflict">%s</pre>' % (
+                conditional_escape(self.conflict)
+            )
+
+        return mark_safe(output)
+
+    def value_from_datadict(self, data, files, name):
+        return self.widget.value_from_datadict(data, files, name)
+
+    def id_for_label(self, id_):
+        return self.widget.id_for_label(id_)
+
+
+class EditorConcurrencyMixin(object):
+    """
+    ModelForm mixin adding optimistic concurrency control to editor fields.
+
+    A token identifying the original contents is rendered with the widget of
+    each field in `concurrency_fields` (by default: all text fields). When the
+    contents have changed by the time the form is posted, validation fails
+    and the field is populated with a three-way merge of both edits. Where
+    the edits overlap, the field keeps the posted contents instead and the
+    merge, with conflict markers, is shown read-only below the widget.
+    Posted contents with conflict markers are rejected.
+
+    Changes are detected by comparing the token with the contents of the
+    form's instance. To rule out races with other writers, post to a form
+    for an instance fetched with `select_for_update()` and save it within
+    the same transaction, as `EditorConcurrencyAdminMixin` does.
+    """
+
+    concurrency_fields = None
+
+    def __init__(self, *args, **kwargs):
+        super(EditorConcurrencyMixin, self).__init__(*args, **kwargs)
+
+        if not self.instance.pk:
+            # Nothing to conflict with on creation
+            self.concurrency_fields = ()
+            return
+
+        self.concurrency_fields = self.get_concurrency_fields()
+
+        for name in self.concurrency_fields:
+            value = self.initial.get(name)
+            token = content_hash(value)
+
+            if not self.is_bound:
+                # Keep the original, for merging in case of a conflict
+                cache.set(
+                    base_cache_key(token), value,
+                    editor_settings.CONCURRENCY_CACHE_TIMEOUT
+                )
+
+            field = self.fields[name]
+            field.widget = ConcurrencyTokenWidget(field.widget, token)
+
+    def get_concurrency_fields(self):
+        """ Return names of fields under concurrency control. """
+
+        if self.concurrency_fields is not None:
+            return self.concurrency_fields
+
+        return [
+            field.name for field in self.instance._meta.fields
+            if isinstance(field, TextField) and field.name in self.fields
+        ]
+
+    def clean(self):
+        cleaned_data = super(EditorConcurrencyMixin, self).clean()
+
+        for name in self.concurrency_fields:
+            if name not in cleaned_data:
+                continue
+
+            token = self.data.get(token_name(self.add_prefix(name)))
+            current = self.initial.get(name)
+            current_token = content_hash(current)
+
+            mine = cleaned_data[name]
+
+            if mine and CONFLICT_MARKERS_RE.search(mine) and not (
+                current and CONFLICT_MARKERS_RE.search(current)
+            ):
+                self._errors[name] = self.error_class([
+                    'Please remove the conflict markers, keeping the '
+                    'changes you want, before saving.'
+                ])
+                del cleaned_data[name]
+                continue
+
+            if token == current_token or mine == current:
+                continue
+
+            # Changed by someone else; offer a merge to resubmit. Without the
+            # original, both versions end up in a single conflict.
+            base = cache.get(base_cache_key(token), '')
+            merged, conflicts = merge3(base, mine or '', current or '')
+
+            widget = self.fields[name].widget
+            widget.token = current_token
+
+            if conflicts:
+                # Keep markers out of the editor, show the merge beside it
+                widget.conflict = merged
+
+                message = (
+                    'This content has been changed by someone else while '
+                    'you were editing. Your version has been kept; please '
+                    'apply the conflicting changes shown below the field '
+                    'and save again.'
+                )
+            else:
+                self.data = self.data.copy()
+                self.data[self.add_prefix(name)] = merged
+
+                message = (
+                    'This content has been changed by someone else while '
+                    'you were editing. Both changes have been merged; '
+                    'please review and save again.'
+                )
+
+            self._errors[name] = self.error_class([message])
+            del cleaned_data[name]
+
+        return cleaned_data
+
+
+class EditorConcurrencyForm(EditorConcurrencyMixin, forms.ModelForm):
+    """ ModelForm with optimistic concurrency control for editor fields. """
+    pass
@@ -0,0 +1,99 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.fields import FieldDoesNotExist
+
+from ...output import render
+from ...settings import editor_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply EDITOR_SAVE_PIPELINE to existing editor contents, in batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'labels', nargs='+', metavar='app_label.Model.field',
+            help='Editor fields to transform.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, dest='batch_size', default=100,
+            help='Number of rows to fetch at a time (default: 100).'
+        )
+
+    def handle(self, *args, **options):
+        pipeline = editor_settings.SAVE_PIPELINE
+
+        if not pipeline:
+            raise CommandError('EDITOR_SAVE_PIPELINE is empty.')
+
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        for label in options['labels']:
+            model, field = self.get_field(label)
+
+            updated = self.transform(
+                model, field, pipeline, options['batch_size']
+            )
+
+            self.stdout.write('%s: %d updated.' % (label, updated))
+
+    def get_field(self, label):
+        """ Return model and field name for `app_label.Model.field`. """
+
+        try:
+            app_label, model_name, field = label.split('.')
+        except ValueError:
+            raise CommandError(
+                "'%s' is not of the form app_label.Model.field." % label
+            )
+
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            raise CommandError(
+                "Unknown model '%s.%s'." % (app_label, model_name)
+            )
+
+        try:
+            model._meta.get_field(field)
+        except FieldDoesNotExist:
+            raise CommandError("Unknown field '%s'." % label)
+
+        return model, field
+
+    def transform(self, model, field, pipeline, batch_size):
+        """
+        Transform contents of `field` for all rows of `model`, in batches by
+        primary key. Returns the number of rows updated.
+        """
+
+        manager = model._base_manager
+        updated = 0
+        last_pk = None
+
+        while True:
+            queryset = manager.order_by('pk')
+
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+
+            batch = list(queryset.values_list('pk', field)[:batch_size])
+
+            for pk, value in batch:
+                if not value:
+                    continue
+
+                transformed = render(value, pipeline)
+
+                if transformed != value:
+                    # Skip rows edited since they were fetched
+                    updated += manager.filter(
+                        pk=pk, **{field: value}
+                    ).update(**{field: transformed})
+
+            if len(batch) < batch_size:
+                return updated
+
+            last_pk = batch[-1][0]
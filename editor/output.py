@@ -0,0 +1,258 @@
+"""
+Output transforms for editor contents, applied in order of the
+`EDITOR_OUTPUT_PIPELINE` setting by the `editor` template tag library, or of
+the `EDITOR_SAVE_PIPELINE` setting once when contents are saved.
+
+Each transform is a callable taking and returning a string of HTML.
+"""
+
+import posixpath
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.importlib import import_module
+
+from .settings import editor_settings
+
+
+TAG_RE = re.compile(r'<[a-z][^>]*>', re.IGNORECASE)
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+
+HEADING_RE = re.compile(
+    r'<h([1-6])\b([^>]*)>(.*?)</h\1\s*>', re.IGNORECASE | re.DOTALL
+)
+
+# Attribute names follow whitespace; a word boundary would match data-src
+ID_ATTR_RE = re.compile(r'(?<=\s)id\s*=', re.IGNORECASE)
+ID_VALUE_RE = re.compile(
+    r'''(?<=\s)id\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE
+)
+LOADING_ATTR_RE = re.compile(r'(?<=\s)loading\s*=', re.IGNORECASE)
+SRC_ATTR_RE = re.compile(
+    r'''(?<=\s)src\s*=\s*(["'])(.*?)\1''', re.IGNORECASE
+)
+SIZE_ATTR_RE = re.compile(r'(?<=\s)(?:width|height)\s*=', re.IGNORECASE)
+SRCSET_ATTR_RE = re.compile(r'(?<=\s)srcset\s*=', re.IGNORECASE)
+WIDTH_VALUE_RE = re.compile(
+    r'''(?<=\s)width\s*=\s*["']?(\d+)["'\s>/]''', re.IGNORECASE
+)
+
+
+def sanitize(html):
+    """
+    Strip tags and attributes not allowed by `EDITOR_SANITIZE_TAGS` and
+    `EDITOR_SANITIZE_ATTRIBUTES`, using `bleach`.
+    """
+
+    try:
+        import bleach
+    except ImportError:
+        raise ImproperlyConfigured(
+            "The 'bleach' package is required for sanitizing editor output."
+        )
+
+    return bleach.clean(
+        html,
+        tags=list(editor_settings.SANITIZE_TAGS),
+        attributes=dict(editor_settings.SANITIZE_ATTRIBUTES),
+        strip=True
+    )
+
+
+def lazy_load_images(html):
+    """ Add `loading="lazy"` to images, unless specified otherwise. """
+
+    def replace(match):
+        tag = match.group(0)
+
+        if LOADING_ATTR_RE.search(tag):
+            return tag
+
+        return '<img loading="lazy"' + tag[len('<img'):]
+
+    return IMG_TAG_RE.sub(replace, html)
+
+
+def image_variant(storage, name, width):
+    """
+    Return the name of a variant of image `name` in `storage`, scaled to
+    `width`, generating it when it does not exist yet.
+    """
+
+    root, extension = posixpath.splitext(name)
+    variant = '%s-%dw%s' % (root, width, extension)
+
+    if storage.exists(variant):
+        return variant
+
+    from io import BytesIO
+
+    from django.core.files.base import ContentFile
+    from PIL import Image
+
+    image_file = storage.open(name)
+    try:
+        image = Image.open(image_file)
+        image.load()
+    finally:
+        image_file.close()
+
+    height = int(round(image.size[1] * float(width) / image.size[0]))
+
+    # LANCZOS is called ANTIALIAS in older versions of PIL
+    resample = getattr(Image, 'LANCZOS', None) or Image.ANTIALIAS
+
+    output = BytesIO()
+    image.resize((width, height), resample).save(
+        output, format=image.format
+    )
+
+    return storage.save(variant, ContentFile(output.getvalue()))
+
+
+def responsive_images(html, storage=None):
+    """
+    Lazy load images and, for images in `storage` (by default the default
+    storage), add `width`, `height` and a `srcset` of variants scaled to the
+    `EDITOR_IMAGE_WIDTHS` smaller than the original. Requires Pillow.
+
+    Meant for `EDITOR_SAVE_PIPELINE`, as it reads and generates images.
+    Images with a `srcset`, or sized too small for variants, are left alone,
+    so contents saved again are not read from storage again.
+    """
+
+    try:
+        import PIL  # NOQA
+    except ImportError:
+        raise ImproperlyConfigured(
+            "The 'Pillow' package is required for responsive editor images."
+        )
+
+    from django.core.files.images import get_image_dimensions
+    from django.utils.six.moves.urllib.parse import unquote
+
+    if storage is None:
+        from django.core.files.storage import default_storage as storage
+
+    base_url = getattr(storage, 'base_url', None)
+
+    def replace(match):
+        tag = match.group(0)
+        src = SRC_ATTR_RE.search(tag)
+
+        if not base_url or not src or not src.group(2).startswith(base_url):
+            return tag
+
+        if SIZE_ATTR_RE.search(tag):
+            width_value = WIDTH_VALUE_RE.search(tag)
+
+            if SRCSET_ATTR_RE.search(tag) or width_value and not any(
+                variant_width < int(width_value.group(1))
+                for variant_width in editor_settings.IMAGE_WIDTHS
+            ):
+                # Done before, or too small for variants
+                return tag
+
+        name = unquote(src.group(2)[len(base_url):])
+
+        if not storage.exists(name):
+            return tag
+
+        image_file = storage.open(name)
+        try:
+            width, height = get_image_dimensions(image_file)
+        finally:
+            image_file.close()
+
+        if not width:
+            # Not an image Pillow understands
+            return tag
+
+        attrs = []
+
+        if not SIZE_ATTR_RE.search(tag):
+            attrs.append('width="%d" height="%d"' % (width, height))
+
+        if not SRCSET_ATTR_RE.search(tag):
+            variants = [
+                '%s %dw' % (
+                    storage.url(image_variant(storage, name, variant_width)),
+                    variant_width
+                )
+                for variant_width in sorted(editor_settings.IMAGE_WIDTHS)
+                if variant_width < width
+            ]
+
+            if variants:
+                variants.append('%s %dw' % (src.group(2), width))
+                attrs.append('srcset="%s"' % ', '.join(variants))
+
+        if not attrs:
+            return tag
+
+        return '<img %s%s' % (' '.join(attrs), tag[len('<img'):])
+
+    return lazy_load_images(IMG_TAG_RE.sub(replace, html))
+
+
+def heading_anchors(html):
+    """ Add unique, slugified `id` attributes to headings without one. """
+
+    from django.utils.html import strip_tags
+    from django.utils.text import slugify
+
+    # Keep clear of ids already in the document
+    used = set(
+        ''.join(match.groups(''))
+        for tag in TAG_RE.findall(html)
+        for match in ID_VALUE_RE.finditer(tag)
+    )
+
+    def replace(match):
+        level, attrs, content = match.groups()
+
+        if ID_ATTR_RE.search(attrs):
+            return match.group(0)
+
+        slug = base = slugify(strip_tags(content)) or 'section'
+        counter = 1
+
+        while slug in used:
+            counter += 1
+            slug = '%s-%d' % (base, counter)
+
+        used.add(slug)
+
+        return '<h%s id="%s"%s>%s</h%s>' % (level, slug, attrs, content, level)
+
+    return HEADING_RE.sub(replace, html)
+
+
+def get_transform(path):
+    """ Return an output transform from a dot-separated import path. """
+
+    module, attr = path.rsplit('.', 1)
+
+    try:
+        return getattr(import_module(module), attr)
+
+    except Exception as e:
+        # Catch ImportError and other exceptions too
+        raise ImproperlyConfigured(
+            "Error while importing '%s': %s" % (path, e)
+        )
+
+
+def render(html, pipeline=None):
+    """
+    Apply an output pipeline, by default `EDITOR_OUTPUT_PIPELINE`, to
+    editor contents.
+    """
+
+    if pipeline is None:
+        pipeline = editor_settings.OUTPUT_PIPELINE
+
+    for path in pipeline:
+        html = get_transform(path)(html)
+
+    return html
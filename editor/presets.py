@@ -43,6 +43,13 @@ class EditorPreset(object):
 
         return Textarea
 
+    def get_form_field(self):
+        """ Get form Field for editor. """
+
+        from .forms import EditorFormField
+
+        return EditorFormField
+
     def get_model_field(self):
         """ Get model Field for editor. """
 
@@ -91,10 +98,15 @@ class ImperaviPreset(EditorPreset):
     def get_model_field(self):
         """ Return Imperavi model field. """
 
+        from .fields import EditorFieldMixin
+
         super_field = super(ImperaviPreset, self).get_model_field()
         widget = self.get_widget()
 
-        class HTMLField(super_field):
+        class HTMLField(EditorFieldMixin, super_field):
+            editor_form_class = self.get_form_field()
+            deconstruct_path = 'django.db.models.TextField'
+
             def formfield(self, **kwargs):
                 # Override the default widget
                 defaults = {'widget': widget}
@@ -151,13 +163,70 @@ class TinyMCEPreset(EditorPreset):
         return TinyMCE
 
     def get_model_field(self):
-        """ Return TinyMCE model field. """
+        """ Wrap TinyMCE model field. """
 
         from tinymce.models import HTMLField
 
-        return HTMLField
+        from .fields import EditorFieldMixin
+
+        class TinyMCEField(EditorFieldMixin, HTMLField):
+            editor_form_class = self.get_form_field()
+            deconstruct_path = 'tinymce.models.HTMLField'
+
+        return TinyMCEField
+
+
+class MarkdownPreset(EditorPreset):
+    """
+    Preset for a plain textarea with Markdown markup, using the `markdown`
+    PyPI package.
+
+    The model field converts Markdown to HTML once at save time and stores
+    the result in a companion `<field>_html` column, so templates can output
+    the rendered HTML without converting on every read.
+    """
+    name = 'markdown'
+    app_name = 'markdown'
+
+    def is_available(self):
+        """ Markdown is not a Django app; check whether it is importable. """
+
+        try:
+            import markdown  # NOQA
+        except ImportError:
+            return False
+
+        return True
+
+    def render(self, value):
+        """
+        Convert Markdown source to HTML, applying `EDITOR_SAVE_PIPELINE`.
+        """
+
+        if not value:
+            return ''
+
+        import markdown
+        from .output import render
+        from .settings import editor_settings
+
+        html = markdown.markdown(
+            value, extensions=list(editor_settings.MARKDOWN_EXTENSIONS)
+        )
+
+        return render(html, editor_settings.SAVE_PIPELINE)
+
+    def get_model_field(self):
+        """
+        Return Markdown model field, storing both source and rendered HTML.
+        """
+
+        from .fields import MarkdownField
+
+        return MarkdownField
 
 
 # Instances of preset singletons
 imperavi = ImperaviPreset()
 tinymce = TinyMCEPreset()
+markdown = MarkdownPreset()
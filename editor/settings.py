@@ -1,8 +1,16 @@
+import sys
+
 from django.conf import settings as django_settings
 from django.utils.importlib import import_module
 from django.core.exceptions import ImproperlyConfigured
 
-from .utils import Singleton
+from .utils import Singleton, Unavailable
+
+try:
+    from django.core.signals import setting_changed
+except ImportError:
+    # Django < 1.8
+    from django.test.signals import setting_changed
 
 
 class Settings(object):
@@ -69,6 +77,57 @@ class EditorSettings(Settings):
         'editor.presets.tinymce'
     )
 
+    # Extensions passed to the `markdown` package by the Markdown preset
+    DEFAULT_MARKDOWN_EXTENSIONS = ()
+
+    # Seconds the original contents of edited fields are cached for merging
+    DEFAULT_CONCURRENCY_CACHE_TIMEOUT = 60 * 60 * 24
+
+    # Maximum length of editor contents in characters, None for no limit
+    DEFAULT_MAX_LENGTH = None
+
+    # Maximum length of posted editor contents in characters, including
+    # inline images, None for no limit
+    DEFAULT_MAX_POST_LENGTH = None
+
+    # Save base64-encoded inline images as files
+    DEFAULT_EXTRACT_INLINE_IMAGES = False
+
+    # Storage path for extracted inline images
+    DEFAULT_INLINE_IMAGE_UPLOAD_TO = 'editor/images/'
+
+    # Maximum size of inline images in bytes, None for no limit
+    DEFAULT_INLINE_IMAGE_MAX_SIZE = None
+
+    # Transforms applied, in order, when rendering editor contents
+    DEFAULT_OUTPUT_PIPELINE = ()
+
+    # Transforms applied, in order, once when editor contents are saved
+    DEFAULT_SAVE_PIPELINE = ()
+
+    # Widths of image variants generated for responsive images
+    DEFAULT_IMAGE_WIDTHS = (480, 960, 1440)
+
+    # Seconds rendered editor contents are cached for
+    DEFAULT_RENDER_CACHE_TIMEOUT = 60 * 60 * 24
+
+    # Change to invalidate cached rendered contents, e.g. after changing
+    # the configuration of custom output transforms
+    DEFAULT_RENDER_CACHE_VERSION = 1
+
+    # Tags and attributes allowed by the sanitize output transform
+    DEFAULT_SANITIZE_TAGS = (
+        'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'h1', 'h2',
+        'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's',
+        'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'th', 'thead',
+        'tr', 'u', 'ul'
+    )
+    DEFAULT_SANITIZE_ATTRIBUTES = {
+        '*': ['class', 'id', 'title'],
+        'a': ['href', 'rel', 'target'],
+        'img': ['alt', 'height', 'loading', 'src', 'srcset', 'width'],
+    }
+
     def _get_preset_instance(self, preset):
         """
         Return the preset class instance from a dot-seperated import path.
@@ -90,6 +149,46 @@ class EditorSettings(Settings):
 
         return getattr(mod, attr)
 
+    # Legacy module attributes, as (module, attribute, preset method)
+    legacy_aliases = (
+        ('editor.admin', 'EditorAdmin', 'get_admin'),
+        ('editor.admin', 'EditorStackedInline', 'get_stackedinline_admin'),
+        ('editor.admin', 'EditorTabularInline', 'get_tabularinline_admin'),
+        ('editor.models', 'EditorField', 'get_model_field'),
+        ('editor.widgets', 'EditorWidget', 'get_widget'),
+    )
+
+    # Resolved preset, cached until settings change
+    _preset = None
+
+    def reset(self):
+        """
+        Forget the resolved preset and refresh legacy aliases in already
+        imported modules, e.g. after settings have been overridden in tests.
+        """
+
+        self._preset = None
+
+        try:
+            preset = self.PRESET
+        except ImproperlyConfigured:
+            # Leave aliases alone, accessing PRESET raises the error
+            return
+
+        for module_name, attr, method in self.legacy_aliases:
+            module = sys.modules.get(module_name)
+
+            if module is None:
+                continue
+
+            try:
+                value = getattr(preset, method)()
+            except ImportError as e:
+                # Editor package not installed; raise the error when used
+                value = Unavailable(e)
+
+            setattr(module, attr, value)
+
     @property
     def PRESET(self):
         """
@@ -97,6 +196,14 @@ class EditorSettings(Settings):
         configurations for editors. Returns a preset object.
         """
 
+        if self._preset is None:
+            self._preset = self._resolve_preset()
+
+        return self._preset
+
+    def _resolve_preset(self):
+        """ Return the configured or first available preset. """
+
         # Get preset from Django settings
         try:
             # Get the preset by hand because somehow __getattr__ does not get
@@ -131,3 +238,13 @@ class EditorSettings(Settings):
 
 
 editor_settings = EditorSettings()
+
+
+def settings_changed(sender, setting, **kwargs):
+    """ Reset the preset when settings determining it change. """
+
+    if setting in ('EDITOR_PRESET', 'EDITOR_PRESETS', 'INSTALLED_APPS'):
+        editor_settings.reset()
+
+
+setting_changed.connect(settings_changed)
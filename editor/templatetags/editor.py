@@ -0,0 +1,111 @@
+from django import template
+from django.core.cache import cache
+from django.utils.encoding import force_text
+from django.utils.safestring import mark_safe
+
+from ..output import render
+from ..settings import editor_settings
+from ..utils import content_hash
+
+
+register = template.Library()
+
+
+def render_cache_key(value, obj=None, attr=None):
+    """
+    Cache key for rendered editor contents of field `attr` of model instance
+    `obj`. As the key includes a hash of the contents, saving changed
+    contents invalidates previously cached fragments.
+    """
+
+    if hasattr(obj, '_meta') and obj.pk is not None:
+        identity = '%s.%s:%s:%s' % (
+            obj._meta.app_label, obj._meta.object_name, obj.pk, attr
+        )
+    else:
+        identity = ''
+
+    # Changing the pipeline or its configuration should not serve stale
+    # fragments either
+    identity += ':%s:%r:%r:%s' % (
+        ','.join(editor_settings.OUTPUT_PIPELINE),
+        sorted(editor_settings.SANITIZE_TAGS),
+        sorted(dict(editor_settings.SANITIZE_ATTRIBUTES).items()),
+        editor_settings.RENDER_CACHE_VERSION
+    )
+
+    return 'editor:render:%s:%s' % (
+        content_hash(identity), content_hash(value)
+    )
+
+
+class RenderEditorNode(template.Node):
+    def __init__(self, value, obj=None, attr=None):
+        self.value = value
+        self.obj = obj
+        self.attr = attr
+
+    def render(self, context):
+        value = self.value.resolve(context)
+
+        if not value:
+            return ''
+
+        value = force_text(value)
+
+        if self.obj is not None:
+            obj = self.obj.resolve(context)
+        else:
+            obj = None
+
+        key = render_cache_key(value, obj, self.attr)
+        html = cache.get(key)
+
+        if html is None:
+            html = render(value)
+
+            cache.set(key, html, editor_settings.RENDER_CACHE_TIMEOUT)
+
+        return mark_safe(html)
+
+
+@register.tag
+def render_editor(parser, token):
+    """
+    Render editor contents through the output pipeline, caching the result::
+
+        {% load editor %}
+
+        {% render_editor object.html_field %}
+    """
+
+    bits = token.split_contents()
+
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            "'%s' takes one argument, i.e. object.field" % bits[0]
+        )
+
+    value = parser.compile_filter(bits[1])
+
+    # Cache per model instance when passed an instance's field
+    obj, dot, attr = bits[1].rpartition('.')
+
+    if dot and '|' not in bits[1]:
+        return RenderEditorNode(value, parser.compile_filter(obj), attr)
+
+    return RenderEditorNode(value)
+
+
+@register.filter
+def editor_html(value):
+    """
+    Render editor contents through the output pipeline, without caching::
+
+        {{ object.html_field|editor_html }}
+    """
+
+    if not value:
+        return ''
+
+    return mark_safe(render(force_text(value)))
@@ -0,0 +1,25 @@
+from django.test.utils import override_settings
+
+
+class override_preset(override_settings):
+    """
+    Activate the editor preset at dot-separated import path `preset`, as
+    either a decorator or a context manager::
+
+        from editor.test_utils import override_preset
+
+        @override_preset('editor.presets.tinymce')
+        class MyTests(TestCase):
+            ...
+
+        with override_preset('editor.presets.imperavi'):
+            ...
+
+    Upon entering and leaving, the resolved preset and the legacy aliases
+    in `editor.admin`, `editor.models` and `editor.widgets` are refreshed
+    together, without reloading modules. Aliases imported elsewhere with
+    `from editor.widgets import EditorWidget` are not updated.
+    """
+
+    def __init__(self, preset):
+        super(override_preset, self).__init__(EDITOR_PRESET=preset)
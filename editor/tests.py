@@ -1,3 +1,5 @@
+import os
+
 from django.utils import unittest
 from django.test.utils import override_settings
 
@@ -9,8 +11,14 @@ from django.db import models
 from django import forms
 from django.contrib import admin
 
+from django.conf.urls import include, url
+
+from .admin import EditorConcurrencyAdminMixin
+from .fields import EditorFieldMixin, MarkdownField
 from .settings import editor_settings
 from .presets import EditorPreset
+from . import presets
+from .utils import content_hash, extract_inline_images, merge3
 
 
 class EditorTestBase(TestCase):
@@ -192,7 +200,18 @@ class TinyMCETests(EditorTestBase):
             tabularinline=admin.TabularInline
         )
 
-        self.assertModelField(field=HTMLField)
+        # Model field wraps HTMLField, using the editor form field
+        from .forms import EditorFormField
+
+        model_field = self.preset.get_model_field()
+        self.assertIsSubclass(model_field, HTMLField)
+        self.assertEquals(
+            model_field().deconstruct()[1], 'tinymce.models.HTMLField'
+        )
+
+        form_field = model_field().formfield()
+        self.assertIsInstance(form_field, EditorFormField)
+        self.assertIsInstance(form_field.widget, TinyMCE)
 
 
 @unittest.skipUnless(
@@ -280,3 +299,938 @@ class ImperaviTests(EditorTestBase):
             form_field.widget,
             ImperaviWidget
         )
+
+        # Form field and migrations path
+        from .forms import EditorFormField
+
+        self.assertIsInstance(form_field, EditorFormField)
+        self.assertEquals(
+            model_field().deconstruct()[1], 'django.db.models.TextField'
+        )
+
+
+class MarkdownDocument(models.Model):
+    """ Model for tests of the Markdown field. """
+    body = MarkdownField(blank=True)
+
+    class Meta:
+        app_label = 'editor'
+
+
+@unittest.skipUnless(
+    # Only run tests when Markdown is available
+    presets.markdown.is_available(),
+    'markdown not available for testing.'
+)
+@override_settings(EDITOR_PRESET='editor.presets.markdown')
+class MarkdownTests(EditorTestBase):
+    """ Tests with the Markdown preset. """
+
+    def test_preset(self):
+        """ Test Markdown preset classes. """
+
+        self.assertEquals(self.preset.name, 'markdown')
+
+        self.assertWidget(widget=forms.Textarea)
+
+        self.assertAdmin(
+            admin=admin.ModelAdmin,
+            stackedinline=admin.StackedInline,
+            tabularinline=admin.TabularInline
+        )
+
+    def test_render_on_save(self):
+        """ Rendered HTML is stored alongside the source at save time. """
+
+        model = MarkdownDocument
+        field = model._meta.get_field('body')
+
+        self.assertEquals(self.preset.get_model_field(), MarkdownField)
+
+        document = model(body='# Title\n\nSome *text*.')
+
+        # Nothing rendered before saving
+        self.assertEquals(document.body_html, '')
+
+        field.pre_save(document, True)
+
+        self.assertIn('<h1>Title</h1>', document.body_html)
+        self.assertIn('<em>text</em>', document.body_html)
+
+        # Rendered field is not editable
+        self.assertFalse(model._meta.get_field('body_html').editable)
+
+    def test_update_fields(self):
+        """ Rendered HTML is saved when listed in `update_fields`. """
+
+        document = MarkdownDocument.objects.create(body='*one*')
+
+        document.body = '*two*'
+        document.save(update_fields=['body'])
+
+        # Not listed, not saved
+        self.assertEquals(
+            MarkdownDocument.objects.get().body_html, '<p><em>one</em></p>'
+        )
+
+        document.save(update_fields=['body', 'body_html'])
+
+        self.assertEquals(
+            MarkdownDocument.objects.get().body_html, '<p><em>two</em></p>'
+        )
+
+    def test_extract_on_save(self):
+        """ Inline images are extracted from the source before rendering. """
+
+        import shutil
+        import tempfile
+
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+
+        gif = 'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+        source = 'Text\n\n<img src="data:image/gif;base64,%s">' % gif
+
+        with self.settings(
+            EDITOR_EXTRACT_INLINE_IMAGES=True,
+            MEDIA_ROOT=location, MEDIA_URL='/media/'
+        ):
+            document = MarkdownDocument.objects.create(body=source)
+
+        name = os.listdir(os.path.join(location, 'editor', 'images'))[0]
+        url = '/media/editor/images/%s' % name
+
+        document = MarkdownDocument.objects.get(pk=document.pk)
+
+        self.assertEquals(document.body, 'Text\n\n<img src="%s">' % url)
+        self.assertNotIn('base64', document.body_html)
+        self.assertIn('<img src="%s">' % url, document.body_html)
+
+    def test_deconstruct(self):
+        """ Migrations reference the field by path, without extra field. """
+
+        field = MarkdownDocument._meta.get_field('body')
+        name, path, args, kwargs = field.deconstruct()
+
+        self.assertEquals(path, 'editor.fields.MarkdownField')
+        self.assertEquals(kwargs['rendered_field'], False)
+
+        # Reconstructed field does not add the rendered field again
+        class MigratedDocument(models.Model):
+            body = MarkdownField(*args, **kwargs)
+            body_html = models.TextField(editable=False, blank=True)
+
+            class Meta:
+                app_label = 'editor'
+
+        self.assertEquals(
+            [field.name for field in MigratedDocument._meta.fields],
+            ['id', 'body', 'body_html']
+        )
+
+    def test_render_large_document(self):
+        """ Conversion of a large (~0.6MB) document. """
+
+        from benchmark import PARAGRAPH
+
+        source = PARAGRAPH * 5000
+
+        html = self.preset.render(source)
+
+        self.assertEquals(html.count('<h2>Heading</h2>'), 5000)
+        self.assertEquals(html.count('<li>item one</li>'), 5000)
+
+
+class Document(models.Model):
+    """ Model for form, admin and command tests. """
+    title = models.CharField(max_length=100)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        app_label = 'editor'
+
+
+class EditorTextField(EditorFieldMixin, models.TextField):
+    """ Editor model field, as created by presets. """
+    pass
+
+
+class EditorDocument(models.Model):
+    """ Model for tests of saving through the editor model field. """
+    body = EditorTextField()
+
+    class Meta:
+        app_label = 'editor'
+
+
+class UninstalledPreset(EditorPreset):
+    """ Preset for an editor package that is not installed. """
+    name = 'uninstalled'
+    app_name = 'uninstalled'
+
+    def get_widget(self):
+        from banana.widgets import BananaWidget
+
+        return BananaWidget
+
+
+uninstalled_preset = UninstalledPreset()
+
+
+class DocumentAdmin(EditorConcurrencyAdminMixin, admin.ModelAdmin):
+    pass
+
+
+site = admin.AdminSite()
+site.register(Document, DocumentAdmin)
+
+urlpatterns = [
+    url(r'^admin/', include(site.urls)),
+]
+
+
+class ConcurrencyTests(TestCase):
+    """ Tests for optimistic concurrency of editor fields. """
+
+    def get_form_class(self):
+        from .forms import EditorConcurrencyForm
+
+        class DocumentForm(EditorConcurrencyForm):
+            class Meta:
+                model = Document
+                fields = ('title', 'body')
+
+        return DocumentForm
+
+    def test_merge3(self):
+        """ Three-way merge of non-overlapping and overlapping changes. """
+
+        base = 'a\nb\nc\nd\ne\n'
+
+        self.assertEquals(
+            merge3(base, 'A\nb\nc\nd\ne\n', 'a\nb\nc\nd\nE\n'),
+            ('A\nb\nc\nd\nE\n', False)
+        )
+
+        merged, conflicts = merge3(
+            base, 'a\nB\nc\nd\ne\n', 'a\nX\nc\nd\ne\n'
+        )
+        self.assertTrue(conflicts)
+        self.assertEquals(
+            merged,
+            'a\n<<<<<<< yours\nB\n=======\nX\n>>>>>>> theirs\nc\nd\ne\n'
+        )
+
+        # Changes to adjacent lines merge cleanly
+        self.assertEquals(
+            merge3('a\nb\nc\n', 'a\nB\nc\n', 'a\nb\nC\n'),
+            ('a\nB\nC\n', False)
+        )
+        self.assertEquals(
+            merge3('one\ntwo\n', 'one\nTWO\n', 'ONE\ntwo\n'),
+            ('ONE\nTWO\n', False)
+        )
+
+        # Insertions at the same position conflict
+        merged, conflicts = merge3('a\nb\n', 'a\nx\nb\n', 'a\ny\nb\n')
+        self.assertTrue(conflicts)
+        self.assertEquals(
+            merged, 'a\n<<<<<<< yours\nx\n=======\ny\n>>>>>>> theirs\nb\n'
+        )
+
+        # Identical or one-sided edits
+        self.assertEquals(merge3(base, base, 'x\n'), ('x\n', False))
+        self.assertEquals(merge3(base, 'x\n', base), ('x\n', False))
+
+    def test_token_rendered(self):
+        """ Token is rendered with the editor widget. """
+
+        form = self.get_form_class()(
+            instance=Document(pk=1, title='Title', body='Body')
+        )
+
+        self.assertEquals(form.concurrency_fields, ['body'])
+        self.assertIn(content_hash('Body'), str(form['body']))
+
+    def test_no_conflict(self):
+        """ Unchanged contents validate. """
+
+        form = self.get_form_class()(
+            data={
+                'title': 'Title', 'body': 'New body',
+                'body__token': content_hash('Body')
+            },
+            instance=Document(pk=1, title='Title', body='Body')
+        )
+
+        self.assertTrue(form.is_valid())
+
+    def test_conflict(self):
+        """ Concurrent change is detected and merged. """
+
+        form_class = self.get_form_class()
+
+        # Original form, caches base contents
+        form_class(instance=Document(pk=1, body='one\ntwo\n'))
+
+        # Someone else changed the first line in the meantime
+        form = form_class(
+            data={
+                'title': 'Title', 'body': 'one\nTWO\n',
+                'body__token': content_hash('one\ntwo\n')
+            },
+            instance=Document(pk=1, title='Title', body='ONE\ntwo\n')
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertIn('body', form.errors)
+
+        # Merge is offered, with a token for the current contents
+        self.assertEquals(form['body'].value(), 'ONE\nTWO\n')
+        self.assertIn(content_hash('ONE\ntwo\n'), str(form['body']))
+
+    def test_conflicting_edits(self):
+        """ Overlapping changes are shown beside the posted contents. """
+
+        form_class = self.get_form_class()
+        form_class(instance=Document(pk=1, body='<p>one</p>\n'))
+
+        form = form_class(
+            data={
+                'title': 'Title', 'body': '<p>mine</p>\n',
+                'body__token': content_hash('<p>one</p>\n')
+            },
+            instance=Document(pk=1, title='Title', body='<p>theirs</p>\n')
+        )
+
+        self.assertFalse(form.is_valid())
+
+        # Editor keeps the posted contents, merge is shown read-only
+        self.assertEquals(form['body'].value(), '<p>mine</p>\n')
+
+        rendered = str(form['body'])
+        self.assertIn(content_hash('<p>theirs</p>\n'), rendered)
+        self.assertIn(
+            '<pre class="editor-conflict">&lt;&lt;&lt;&lt;&lt;&lt;&lt; yours\n'
+            '&lt;p&gt;mine&lt;/p&gt;\n=======\n&lt;p&gt;theirs&lt;/p&gt;\n'
+            '&gt;&gt;&gt;&gt;&gt;&gt;&gt; theirs\n</pre>',
+            rendered
+        )
+
+    def test_conflict_markers(self):
+        """ Contents with conflict markers are rejected. """
+
+        form = self.get_form_class()(
+            data={
+                'title': 'Title',
+                'body': 'a\r\n<<<<<<< yours\r\nB\r\n=======\r\nX\r\n'
+                        '>>>>>>> theirs\r\n',
+                'body__token': content_hash('a\nX\n')
+            },
+            instance=Document(pk=1, title='Title', body='a\nX\n')
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertIn('conflict markers', form.errors['body'][0])
+
+
+@override_settings(
+    ROOT_URLCONF='editor.tests',
+    MIDDLEWARE_CLASSES=(
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    )
+)
+class ConcurrencyAdminTests(TestCase):
+    """ Tests for optimistic concurrency in the admin. """
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.client.login(username='admin', password='admin')
+
+        self.document = Document.objects.create(
+            title='Title', body='one\ntwo\n'
+        )
+        self.url = '/admin/editor/document/%d/' % self.document.pk
+
+    def post(self, body, token):
+        return self.client.post(
+            self.url, {'title': 'Title', 'body': body, 'body__token': token}
+        )
+
+    def test_save(self):
+        """ Unchanged contents are saved. """
+
+        response = self.client.get(self.url)
+        self.assertContains(response, content_hash('one\ntwo\n'))
+
+        response = self.post('one\nTWO\n', content_hash('one\ntwo\n'))
+
+        self.assertEquals(response.status_code, 302)
+        self.assertEquals(Document.objects.get().body, 'one\nTWO\n')
+
+    def test_conflict(self):
+        """ Concurrent change is shown as a merge, nothing is saved. """
+
+        from django.contrib.admin.models import LogEntry
+
+        # Start editing, caches base contents
+        self.client.get(self.url)
+
+        # Someone else changed the first line in the meantime
+        Document.objects.update(body='ONE\ntwo\n')
+
+        response = self.post('one\nTWO\n', content_hash('one\ntwo\n'))
+
+        self.assertEquals(response.status_code, 200)
+
+        form = response.context['adminform'].form
+        self.assertIn('body', form.errors)
+        self.assertEquals(form['body'].value(), 'ONE\nTWO\n')
+
+        self.assertEquals(Document.objects.get().body, 'ONE\ntwo\n')
+        self.assertFalse(LogEntry.objects.exists())
+
+        # Saving the merge succeeds
+        response = self.post('ONE\nTWO\n', content_hash('ONE\ntwo\n'))
+
+        self.assertEquals(response.status_code, 302)
+        self.assertEquals(Document.objects.get().body, 'ONE\nTWO\n')
+
+
+def concurrent_edit(html):
+    """ Output transform simulating a concurrent edit of the second row. """
+
+    Document.objects.filter(body='<img src="2.png">').update(
+        body='<img src="edited.png">'
+    )
+
+    return html.replace('<img ', '<img loading="lazy" ')
+
+
+@override_settings(
+    EDITOR_SAVE_PIPELINE=('editor.output.lazy_load_images', )
+)
+class TransformCommandTests(TestCase):
+    """ Tests for the editor_transform management command. """
+
+    def setUp(self):
+        for number in range(5):
+            Document.objects.create(body='<img src="%d.png">' % number)
+
+        # Empty contents are skipped
+        Document.objects.create(body='')
+
+    def call_command(self, *args, **kwargs):
+        from django.core.management import call_command
+        from django.utils.six import StringIO
+
+        stdout = StringIO()
+        call_command('editor_transform', *args, stdout=stdout, **kwargs)
+
+        return stdout.getvalue()
+
+    def test_transform(self):
+        """ All rows are transformed, in batches. """
+
+        # 6 rows in 3 full batches, a final empty batch and 5 updates
+        with self.assertNumQueries(9):
+            output = self.call_command('editor.Document.body', batch_size=2)
+
+        self.assertEquals(output, 'editor.Document.body: 5 updated.\n')
+        bodies = Document.objects.order_by('pk').values_list(
+            'body', flat=True
+        )
+        self.assertEquals(
+            list(bodies),
+            ['<img loading="lazy" src="%d.png">' % number
+             for number in range(5)] + ['']
+        )
+
+        # Running again changes nothing
+        output = self.call_command('editor.Document.body')
+        self.assertEquals(output, 'editor.Document.body: 0 updated.\n')
+
+    @override_settings(EDITOR_SAVE_PIPELINE=('editor.tests.concurrent_edit', ))
+    def test_skip_changed(self):
+        """ Rows edited since they were fetched are left alone. """
+
+        output = self.call_command('editor.Document.body', batch_size=10)
+
+        self.assertEquals(output, 'editor.Document.body: 4 updated.\n')
+        self.assertTrue(
+            Document.objects.filter(body='<img src="edited.png">').exists()
+        )
+
+    def test_errors(self):
+        """ Wrong labels, settings and options raise CommandError. """
+
+        from django.core.management import CommandError
+
+        for label in (
+            'editor.Document', 'editor.Banana.body', 'editor.Document.banana'
+        ):
+            self.assertRaises(CommandError, self.call_command, label)
+
+        with self.settings(EDITOR_SAVE_PIPELINE=()):
+            self.assertRaises(
+                CommandError, self.call_command, 'editor.Document.body'
+            )
+
+        for batch_size in (0, -1):
+            self.assertRaises(
+                CommandError, self.call_command, 'editor.Document.body',
+                batch_size=batch_size
+            )
+
+
+class FormFieldTests(TestCase):
+    """ Tests for content limits of the editor form field. """
+
+    # 1x1 transparent GIF
+    gif = 'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+
+    def setUp(self):
+        import tempfile
+
+        from django.core.files.storage import FileSystemStorage
+
+        self.location = tempfile.mkdtemp()
+        self.storage = FileSystemStorage(
+            location=self.location, base_url='/media/'
+        )
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.location)
+
+    def test_form_field(self):
+        """ Presets use the editor form field. """
+
+        from .forms import EditorFormField
+
+        self.assertEquals(
+            editor_settings.PRESET.get_form_field(), EditorFormField
+        )
+
+    @override_settings(EDITOR_MAX_LENGTH=10)
+    def test_max_length(self):
+        """ Oversized content is rejected. """
+
+        from .forms import EditorFormField
+
+        field = EditorFormField()
+
+        self.assertEquals(field.clean('short'), 'short')
+        self.assertRaises(
+            forms.ValidationError, field.clean, 'much too long'
+        )
+
+    def test_max_post_length(self):
+        """ Oversized posts are rejected before extracting images. """
+
+        from .forms import EditorFormField
+
+        html = '<img src="data:image/gif;base64,%s">' % self.gif
+
+        with self.settings(
+            EDITOR_EXTRACT_INLINE_IMAGES=True, EDITOR_MAX_POST_LENGTH=50,
+            MEDIA_ROOT=self.location
+        ):
+            self.assertRaises(
+                forms.ValidationError, EditorFormField().clean, html
+            )
+
+        self.assertEquals(os.listdir(self.location), [])
+
+    def test_extract_on_save(self):
+        """ Images are validated by the form, extracted by the model. """
+
+        from .forms import EditorFormField
+
+        html = '<p>Text</p><img src="data:image/gif;base64,%s">' % self.gif
+
+        with self.settings(
+            EDITOR_EXTRACT_INLINE_IMAGES=True, EDITOR_MAX_LENGTH=90,
+            MEDIA_ROOT=self.location, MEDIA_URL='/media/'
+        ):
+            # Length is validated as saved, with the image URL
+            self.assertEquals(EditorFormField().clean(html), html)
+
+            # Nothing is written while validating
+            self.assertEquals(os.listdir(self.location), [])
+
+            document = EditorDocument.objects.create(body=html)
+
+        name = os.listdir(os.path.join(self.location, 'editor', 'images'))[0]
+        url = '/media/editor/images/%s' % name
+
+        self.assertEquals(document.body, '<p>Text</p><img src="%s">' % url)
+        self.assertEquals(
+            EditorDocument.objects.get().body, document.body
+        )
+
+    def test_extract_inline_images(self):
+        """ Inline images are saved as files and referenced by URL. """
+
+        html = (
+            '<p>Text</p><img alt="pixel" src="data:image/gif;base64,%s">'
+            '<img src=\'data:image/gif;base64,%s\'/>' % (self.gif, self.gif)
+        )
+
+        result = extract_inline_images(
+            html, upload_to='images/', storage=self.storage
+        )
+
+        self.assertNotIn('base64', result)
+
+        # Same image is stored once
+        self.assertEquals(len(self.storage.listdir('images')[1]), 1)
+
+        name = self.storage.listdir('images')[1][0]
+        self.assertEquals(
+            result,
+            '<p>Text</p><img alt="pixel" src="/media/images/%s">'
+            '<img src=\'/media/images/%s\'/>' % (name, name)
+        )
+
+    def test_inline_image_max_size(self):
+        """ Oversized inline images are rejected before decoding. """
+
+        html = '<img src="data:image/gif;base64,%s">' % self.gif
+
+        self.assertRaises(
+            forms.ValidationError,
+            extract_inline_images,
+            html, upload_to='images/', max_size=10, storage=self.storage
+        )
+
+    def test_unsupported_inline_image(self):
+        """ Unsupported image types are left alone. """
+
+        html = '<img src="data:image/svg+xml;base64,PHN2Zy8+">'
+
+        self.assertEquals(
+            extract_inline_images(
+                html, upload_to='images/', storage=self.storage
+            ),
+            html
+        )
+
+
+class OutputTests(TestCase):
+    """ Tests for output transforms and the editor template tags. """
+
+    def render_template(self, template, **context):
+        from django.template import Context, Template
+
+        return Template('{% load editor %}' + template).render(
+            Context(context)
+        )
+
+    def test_lazy_load_images(self):
+        """ Images are lazy loaded, unless specified otherwise. """
+
+        from .output import lazy_load_images
+
+        self.assertEquals(
+            lazy_load_images('<p><img src="a.png"><IMG loading="eager"></p>'),
+            '<p><img loading="lazy" src="a.png"><IMG loading="eager"></p>'
+        )
+
+        self.assertEquals(
+            lazy_load_images('<img data-loading="x">'),
+            '<img loading="lazy" data-loading="x">'
+        )
+
+    def test_heading_anchors(self):
+        """ Headings get unique anchors. """
+
+        from .output import heading_anchors
+
+        self.assertEquals(
+            heading_anchors(
+                '<h1>Title</h1><h2 class="x">Title</h2><h3 id="y">Z</h3>'
+            ),
+            '<h1 id="title">Title</h1><h2 id="title-2" class="x">Title</h2>'
+            '<h3 id="y">Z</h3>'
+        )
+
+        self.assertEquals(
+            heading_anchors('<h2 data-id="3">A</h2>'),
+            '<h2 id="a" data-id="3">A</h2>'
+        )
+
+        # Existing ids are not reused, wherever they are
+        self.assertEquals(
+            heading_anchors(
+                '<h2 id="hello">A</h2><h2>Hello</h2>'
+                '<p id=\'a\'>x</p><h3>A</h3>'
+            ),
+            '<h2 id="hello">A</h2><h2 id="hello-2">Hello</h2>'
+            '<p id=\'a\'>x</p><h3 id="a-2">A</h3>'
+        )
+
+    def test_responsive_images(self):
+        """ Local images get dimensions and a srcset of variants. """
+
+        try:
+            from PIL import Image
+        except ImportError:
+            raise unittest.SkipTest('Pillow not available for testing.')
+
+        import shutil
+        import tempfile
+        from io import BytesIO
+
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import FileSystemStorage
+
+        from .output import responsive_images
+
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location, base_url='/media/')
+
+        image = BytesIO()
+        Image.new('RGB', (1000, 500)).save(image, format='PNG')
+        storage.save('a.png', ContentFile(image.getvalue()))
+
+        html = '<p><img src="/media/a.png"><img src="http://x/b.png"></p>'
+
+        with self.settings(EDITOR_IMAGE_WIDTHS=(480, 960, 1440)):
+            result = responsive_images(html, storage=storage)
+
+        self.assertEquals(
+            result,
+            '<p><img loading="lazy" width="1000" height="500" '
+            'srcset="/media/a-480w.png 480w, /media/a-960w.png 960w, '
+            '/media/a.png 1000w" src="/media/a.png">'
+            '<img loading="lazy" src="http://x/b.png"></p>'
+        )
+
+        self.assertEquals(
+            Image.open(storage.path('a-480w.png')).size, (480, 240)
+        )
+
+        # Running again changes nothing
+        self.assertEquals(responsive_images(result, storage=storage), result)
+
+        # Images too small for variants are only read once
+        opened = []
+
+        class CountingStorage(FileSystemStorage):
+            def _open(self, name, mode='rb'):
+                opened.append(name)
+
+                return super(CountingStorage, self)._open(name, mode)
+
+        storage = CountingStorage(location=location, base_url='/media/')
+
+        image = BytesIO()
+        Image.new('RGB', (300, 200)).save(image, format='PNG')
+        storage.save('small.png', ContentFile(image.getvalue()))
+
+        with self.settings(EDITOR_IMAGE_WIDTHS=(480, 960, 1440)):
+            result = responsive_images(
+                '<img src="/media/small.png">', storage=storage
+            )
+            self.assertEquals(
+                result,
+                '<img loading="lazy" width="300" height="200" '
+                'src="/media/small.png">'
+            )
+
+            self.assertEquals(
+                responsive_images(result, storage=storage), result
+            )
+
+        self.assertEquals(opened, ['small.png'])
+
+        # Data attributes are not taken for the real ones
+        html = (
+            '<img data-width="1" data-srcset="x" data-src="/media/b.png" '
+            'src="/media/a.png">'
+        )
+
+        with self.settings(EDITOR_IMAGE_WIDTHS=(480, )):
+            self.assertEquals(
+                responsive_images(html, storage=storage),
+                '<img loading="lazy" width="1000" height="500" '
+                'srcset="/media/a-480w.png 480w, /media/a.png 1000w" '
+                'data-width="1" data-srcset="x" data-src="/media/b.png" '
+                'src="/media/a.png">'
+            )
+
+    @override_settings(
+        EDITOR_SAVE_PIPELINE=('editor.output.lazy_load_images', )
+    )
+    def test_save_pipeline(self):
+        """ Editor model field applies the save pipeline when saving. """
+
+        from .forms import EditorFormField
+
+        # Not when validating
+        self.assertEquals(
+            EditorFormField().clean('<img src="a.png">'), '<img src="a.png">'
+        )
+
+        EditorDocument.objects.create(body='<img src="a.png">')
+
+        self.assertEquals(
+            EditorDocument.objects.get().body,
+            '<img loading="lazy" src="a.png">'
+        )
+
+    @override_settings(EDITOR_OUTPUT_PIPELINE=('banana.juice', ))
+    def test_wrong_transform(self):
+        """ Nonexistent transforms raise ImproperlyConfigured. """
+
+        from .output import render
+
+        self.assertRaises(ImproperlyConfigured, render, '<p>Text</p>')
+
+    @override_settings(
+        EDITOR_OUTPUT_PIPELINE=('editor.output.heading_anchors', )
+    )
+    def test_render_editor(self):
+        """ Tag renders through pipeline and caches per instance. """
+
+        from django.core.cache import cache
+
+        from .templatetags.editor import render_cache_key
+
+        document = Document(pk=1, body='<h1>Title</h1>')
+
+        self.assertEquals(
+            self.render_template(
+                '{% render_editor document.body %}', document=document
+            ),
+            '<h1 id="title">Title</h1>'
+        )
+
+        key = render_cache_key(document.body, document, 'body')
+        self.assertEquals(cache.get(key), '<h1 id="title">Title</h1>')
+
+        # Changed contents are not served from the cache
+        document.body = '<h1>Other</h1>'
+        self.assertNotEqual(
+            render_cache_key(document.body, document, 'body'), key
+        )
+        self.assertEquals(
+            self.render_template(
+                '{% render_editor document.body %}', document=document
+            ),
+            '<h1 id="other">Other</h1>'
+        )
+
+    def test_render_cache_key_configuration(self):
+        """ Changing the pipeline configuration changes the cache key. """
+
+        from .templatetags.editor import render_cache_key
+
+        document = Document(pk=1, body='<p>Text</p>')
+        key = render_cache_key(document.body, document, 'body')
+
+        for setting, value in (
+            ('EDITOR_OUTPUT_PIPELINE', ('editor.output.sanitize', )),
+            ('EDITOR_SANITIZE_TAGS', ('p', )),
+            ('EDITOR_SANITIZE_ATTRIBUTES', {'*': ['class']}),
+            ('EDITOR_RENDER_CACHE_VERSION', 2),
+        ):
+            with self.settings(**{setting: value}):
+                self.assertNotEqual(
+                    render_cache_key(document.body, document, 'body'), key
+                )
+
+        self.assertEquals(
+            render_cache_key(document.body, document, 'body'), key
+        )
+
+    @override_settings(
+        EDITOR_OUTPUT_PIPELINE=('editor.output.lazy_load_images', )
+    )
+    def test_editor_html(self):
+        """ Filter renders through pipeline. """
+
+        self.assertEquals(
+            self.render_template('{{ value|editor_html }}', value='<img>'),
+            '<img loading="lazy">'
+        )
+
+
+@unittest.skipUnless(
+    # Only run tests when both editors are available
+    'tinymce' in settings.INSTALLED_APPS and
+    'imperavi' in settings.INSTALLED_APPS,
+    'django-tinymce or django-imperavi not available for testing.'
+)
+class OverridePresetTests(EditorTestBase):
+    """ Tests for swapping presets in tests. """
+
+    def test_preset_cached(self):
+        """ Preset is resolved once. """
+
+        self.assertIs(editor_settings.PRESET, editor_settings.PRESET)
+
+    def test_override_preset(self):
+        """ Preset and legacy aliases are swapped together. """
+
+        from . import admin as editor_admin
+        from . import widgets as editor_widgets
+        from .test_utils import override_preset
+
+        from tinymce.widgets import TinyMCE
+        from imperavi.widget import ImperaviWidget
+
+        with override_preset('editor.presets.tinymce'):
+            self.assertEquals(editor_settings.PRESET.name, 'django-tinymce')
+            self.assertEquals(editor_widgets.EditorWidget, TinyMCE)
+            self.assertIsSubclass(
+                editor_admin.EditorTabularInline, admin.TabularInline
+            )
+
+        with override_preset('editor.presets.imperavi'):
+            self.assertEquals(editor_settings.PRESET.name, 'django-imperavi')
+            self.assertEquals(editor_widgets.EditorWidget, ImperaviWidget)
+            self.assertEquals(
+                editor_admin.EditorTabularInline, NotImplemented
+            )
+
+    def test_uninstalled_preset(self):
+        """ Overriding with a preset that can not be imported works. """
+
+        from . import widgets as editor_widgets
+        from .test_utils import override_preset
+
+        widget = editor_widgets.EditorWidget
+
+        with override_preset('editor.tests.uninstalled_preset'):
+            self.assertEquals(editor_settings.PRESET.name, 'uninstalled')
+
+            self.assertRaises(ImportError, editor_settings.PRESET.get_widget)
+
+            # Unresolvable aliases raise the ImportError when used
+            alias = editor_widgets.EditorWidget
+            self.assertNotEqual(alias, widget)
+            self.assertRaises(ImportError, alias)
+            self.assertRaises(ImportError, getattr, alias, 'media')
+
+            def subclass():
+                class BananaWidget(alias):
+                    pass
+
+            self.assertRaises(ImportError, subclass)
+
+        self.assertEquals(editor_widgets.EditorWidget, widget)
+
+    @override_settings(EDITOR_PRESET='banana.juice')
+    def test_wrong_preset_not_cached(self):
+        """ Errors are raised on each access. """
+
+        self.assertRaises(ImproperlyConfigured, lambda: editor_settings.PRESET)
+        self.assertRaises(ImproperlyConfigured, lambda: editor_settings.PRESET)
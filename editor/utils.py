@@ -1,3 +1,6 @@
+import re
+
+
 class Singleton(type):
     """
     Singleton metaclass.
@@ -13,3 +16,260 @@ class Singleton(type):
             )
 
         return cls._instances[cls]
+
+
+class Unavailable(object):
+    """
+    Placeholder for a legacy alias that could not be imported, raising the
+    original ImportError when it is used: called, subclassed or accessed.
+    """
+
+    def __new__(cls, *args):
+        if len(args) == 3:
+            # Used as base class, with (name, bases, attrs)
+            for base in args[1]:
+                if isinstance(base, Unavailable):
+                    raise base._error
+
+        return super(Unavailable, cls).__new__(cls)
+
+    def __init__(self, error):
+        self.__dict__['_error'] = error
+
+    def __call__(self, *args, **kwargs):
+        raise self._error
+
+    def __getattr__(self, name):
+        raise self.__dict__['_error']
+
+    def __repr__(self):
+        return '<Unavailable: %s>' % self._error
+
+
+def content_hash(value):
+    """ Return a hex digest identifying the (text) contents of a field. """
+
+    import hashlib
+
+    from django.utils.encoding import force_bytes
+
+    return hashlib.sha1(force_bytes(value or '')).hexdigest()
+
+
+def lock_and_refresh(instance, names):
+    """
+    Lock the row of `instance` until the end of the current transaction with
+    `SELECT ... FOR UPDATE` by primary key, refreshing the fields `names`
+    from it.
+
+    Checking for concurrent changes against the refreshed values can then
+    not be raced by other writers, while the instance is saved as usual.
+    """
+
+    values = instance.__class__._base_manager.select_for_update().filter(
+        pk=instance.pk
+    ).values_list(*names).get()
+
+    for name, value in zip(names, values):
+        setattr(instance, name, value)
+
+
+def merge3(base, mine, theirs):
+    """
+    Line-based three-way merge of two texts, `mine` and `theirs`, both
+    derived from `base`.
+
+    Returns a tuple `(merged, conflicts)`; overlapping changes are included
+    in `merged` between conflict markers and make `conflicts` True.
+    """
+
+    import difflib
+
+    if mine == theirs or base == theirs:
+        return mine, False
+
+    if base == mine:
+        return theirs, False
+
+    def lines(text):
+        # Make sure the last line is terminated, for clean conflict markers
+        result = text.splitlines(True)
+        if result and not result[-1].endswith('\n'):
+            result[-1] += '\n'
+
+        return result
+
+    def changes(other_lines):
+        matcher = difflib.SequenceMatcher(
+            None, base_lines, other_lines, autojunk=False
+        )
+
+        return [
+            (i1, i2, other_lines[j1:j2])
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+            if tag != 'equal'
+        ]
+
+    def apply(hunks, start, end):
+        result = []
+        position = start
+
+        for i1, i2, replacement in hunks:
+            result.extend(base_lines[position:i1])
+            result.extend(replacement)
+            position = i2
+
+        result.extend(base_lines[position:end])
+
+        return result
+
+    base_lines = lines(base)
+    pending = (changes(lines(mine)), changes(lines(theirs)))
+
+    merged = []
+    conflicts = False
+    position = 0
+
+    def overlaps(hunk, start, end):
+        # Changes to adjacent lines do not overlap, but insertions at the
+        # boundary of a region do, as their order would be ambiguous.
+        i1, i2 = hunk[:2]
+
+        return i1 < end or (i1 == end and (i1 == i2 or start == end))
+
+    while pending[0] or pending[1]:
+        # Start a region at the first change on either side and grow it with
+        # all changes from both sides that overlap it.
+        firsts = [hunks[0][0] for hunks in pending if hunks]
+        start = end = min(firsts)
+        region = ([], [])
+
+        grown = True
+        while grown:
+            grown = False
+
+            for side, hunks in enumerate(pending):
+                while hunks and overlaps(hunks[0], start, end):
+                    hunk = hunks.pop(0)
+                    region[side].append(hunk)
+                    end = max(end, hunk[1])
+                    grown = True
+
+        merged.extend(base_lines[position:start])
+
+        mine_region = apply(region[0], start, end)
+        theirs_region = apply(region[1], start, end)
+
+        if not region[1] or mine_region == theirs_region:
+            merged.extend(mine_region)
+        elif not region[0]:
+            merged.extend(theirs_region)
+        else:
+            conflicts = True
+            merged.append('<<<<<<< yours\n')
+            merged.extend(mine_region)
+            merged.append('=======\n')
+            merged.extend(theirs_region)
+            merged.append('>>>>>>> theirs\n')
+
+        position = end
+
+    merged.extend(base_lines[position:])
+    merged = ''.join(merged)
+
+    if not conflicts and not (
+        mine.endswith('\n') or theirs.endswith('\n')
+    ):
+        # Drop the terminator added to the last line above
+        merged = merged[:-1]
+
+    return merged, conflicts
+
+
+CONFLICT_MARKERS_RE = re.compile(
+    r'^<<<<<<< yours\r?$.*^=======\r?$.*^>>>>>>> theirs\r?$',
+    re.MULTILINE | re.DOTALL
+)
+
+
+# <img src="data:image/...;base64,..."> attributes of pasted images
+INLINE_IMAGE_RE = re.compile(
+    r'''(<img\b[^>]*?\bsrc\s*=\s*)(["'])'''
+    r'''data:(image/[a-z0-9.+-]+);base64,([a-z0-9+/=\s]*)\2''',
+    re.IGNORECASE
+)
+
+# File extensions for extracted images; other types are left inline
+INLINE_IMAGE_TYPES = {
+    'image/gif': 'gif',
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+}
+
+
+def extract_inline_images(html, upload_to, max_size=None, storage=None,
+                          save=True):
+    """
+    Save base64-encoded inline images in `html` as files under `upload_to`
+    in `storage`, rewriting their `src` to the file URL.
+
+    Images are processed one at a time and named after their contents, so
+    resubmitting the same image does not create a new file. Raises
+    `ValidationError` for images larger than `max_size` bytes, before
+    decoding them. With `save=False`, images are only validated and the
+    rewritten HTML is returned without writing any files.
+    """
+
+    import base64
+    import binascii
+    import hashlib
+    import posixpath
+
+    from django.core.exceptions import ValidationError
+    from django.core.files.base import ContentFile
+
+    if storage is None:
+        from django.core.files.storage import default_storage as storage
+
+    pieces = []
+    position = 0
+
+    for match in INLINE_IMAGE_RE.finditer(html):
+        prefix, quote, mimetype, encoded = match.groups()
+        extension = INLINE_IMAGE_TYPES.get(mimetype.lower())
+
+        if not extension:
+            continue
+
+        encoded = ''.join(encoded.split())
+
+        # Decoded size is 3/4 of the encoded size
+        if max_size and len(encoded) * 3 // 4 > max_size:
+            raise ValidationError(
+                'Inline images can be at most %d bytes.' % max_size
+            )
+
+        try:
+            data = base64.b64decode(encoded)
+        except (binascii.Error, TypeError):
+            raise ValidationError('Invalid inline image data.')
+
+        name = posixpath.join(
+            upload_to,
+            '%s.%s' % (hashlib.sha1(data).hexdigest(), extension)
+        )
+
+        if save and not storage.exists(name):
+            name = storage.save(name, ContentFile(data))
+
+        pieces.append(html[position:match.start()])
+        pieces.append('%s%s%s%s' % (prefix, quote, storage.url(name), quote))
+        position = match.end()
+
+    if not pieces:
+        return html
+
+    pieces.append(html[position:])
+
+    return ''.join(pieces)